@@ -9,26 +9,77 @@ Usage:
     python manage.py sync_production --year 2025       # Sync full year
     python manage.py sync_production --weeks 4         # Sync last 4 weeks
     python manage.py sync_production --dry-run         # Preview only
+    python manage.py sync_production --chunk-size 5000 # Rows per fetch/save batch
+    python manage.py sync_production --workers 4       # Transform/save in 4 processes
 
 Environment Variables (set in .env.production):
     PROD_SQL_SERVER     - Production server (FOXXSQLPROD)
     PROD_SQL_DATABASE   - Production database (XLCServices1)
     PROD_SQL_USER       - Service account username
     PROD_SQL_PASSWORD   - Service account password
+    PROD_SQL_PACKET_SIZE - ODBC network packet size in bytes (default: 32768)
+
+Optional dependency (not in requirements.txt):
+    arrow-odbc          - When installed, production rows are read as Arrow
+                          batches instead of pyodbc rows. Column dtypes differ
+                          (e.g. dates arrive as date objects) and parameters
+                          are bound as VARCHAR; pyodbc is the supported default.
 """
 
+import io
 import os
 import logging
-from datetime import datetime, timedelta
+import multiprocessing
+import queue
+import threading
+import time
+from contextlib import closing
+from itertools import islice, repeat
+from datetime import date, timedelta
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+import django
 from django.core.management.base import BaseCommand
-from django.db import transaction
+from django.db import DatabaseError, connection, connections, transaction
+from django.db.models import Q
 import pyodbc
+import numpy as np
 import pandas as pd
+from pandas.api.types import infer_dtype, is_datetime64_any_dtype, is_float_dtype
+
+try:
+    import arrow_odbc
+except ImportError:  # Opt-in: the default reader fetches pyodbc rows
+    arrow_odbc = None
 
 from core.models import TimeEntry
 
 logger = logging.getLogger(__name__)
 
+# Natural key of a production time entry, used to drop duplicate rows
+DUPLICATE_KEY_COLUMNS = ['ApplicantID', 'WorkDate', 'dtTimeStart', 'dtTimeEnd']
+
+# Low-cardinality string columns that are compared repeatedly during transform
+CATEGORY_COLUMNS = ['ClockIn_Method', 'ClockOut_Method', 'OfcName', 'Allocation_Method']
+
+# ODBC connection attribute for the network packet size; must be set before connecting
+SQL_ATTR_PACKET_SIZE = 112
+
+# Model field types whose values still go through Field.get_db_prep_save on insert
+ADAPTED_FIELD_TYPES = ('DateField', 'DateTimeField')
+
+# Seconds to wait for the production login before giving up
+LOGIN_TIMEOUT_SECONDS = 60
+
+# Attempts at a database write chosen as a SQL Server deadlock victim (--workers)
+DEADLOCK_ATTEMPTS = 3
+
+# Office consolidation from Power Query (offices not listed map to themselves)
+XLC_OPERATION_MAPPING = {
+    'Blue Ash': 'P&G Cincinnati',
+    'Cincinnati': 'P&G Cincinnati',
+    'St. Bernard': 'P&G Cincinnati',
+}
+
 
 class Command(BaseCommand):
     help = 'Sync time entry data from FOXXSQLPROD production database'
@@ -53,11 +104,27 @@ class Command(BaseCommand):
         parser.add_argument(
             '--replace',
             action='store_true',
-            help='Replace existing data for the period'
+            help='Replace existing records in the synced weeks: matching records are updated '
+                 'and records no longer returned by production are deleted'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=10000,
+            help='Number of rows to fetch, transform and save at a time (default: 10000)'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Worker processes for transform and save (default: 1). '
+                 'Values above 1 commit each chunk separately and skip the cross-chunk '
+                 'natural-key dedupe, so they can store different rows than 1; '
+                 'not suited to SQLite'
         )
 
-    def get_production_connection(self):
-        """Get connection to FOXXSQLPROD."""
+    def get_connection_string(self):
+        """Build the ODBC connection string for FOXXSQLPROD."""
         server = os.environ.get('PROD_SQL_SERVER', 'FOXXSQLPROD')
         database = os.environ.get('PROD_SQL_DATABASE', 'XLCServices1')
         user = os.environ.get('PROD_SQL_USER', '')
@@ -69,26 +136,37 @@ class Command(BaseCommand):
                 "Set PROD_SQL_SERVER, PROD_SQL_USER, PROD_SQL_PASSWORD in environment."
             )
 
-        conn_str = (
+        self.stdout.write(f"Connecting to {server}/{database}...")
+        return (
             f"DRIVER={{ODBC Driver 17 for SQL Server}};"
             f"SERVER={server};"
             f"DATABASE={database};"
             f"UID={user};"
             f"PWD={password};"
             f"TrustServerCertificate=yes;"
+            f"MARS_Connection=yes;"
         )
 
-        self.stdout.write(f"Connecting to {server}/{database}...")
-        return pyodbc.connect(conn_str)
+    def get_packet_size(self):
+        """ODBC network packet size in bytes (larger packets mean fewer round trips)."""
+        return int(os.environ.get('PROD_SQL_PACKET_SIZE', '32768'))
+
+    def get_production_connection(self):
+        """Get connection to FOXXSQLPROD."""
+        return pyodbc.connect(
+            self.get_connection_string(),
+            timeout=LOGIN_TIMEOUT_SECONDS,
+            attrs_before={SQL_ATTR_PACKET_SIZE: self.get_packet_size()}
+        )
 
     def calculate_date_range(self, year=None, weeks=1):
         """Calculate the date range to sync."""
-        today = datetime.now().date()
+        today = date.today()
 
         if year:
             # Full year
-            start_date = datetime(year, 1, 1).date()
-            end_date = datetime(year, 12, 31).date()
+            start_date = date(year, 1, 1)
+            end_date = date(year, 12, 31)
         else:
             # Calculate last N payroll weeks (ending on Sunday)
             # Find last Sunday
@@ -96,59 +174,19 @@ class Command(BaseCommand):
             last_sunday = today - timedelta(days=days_since_sunday)
 
             # Go back N weeks
-            start_date = last_sunday - timedelta(weeks=weeks - 1, days=6)
+            start_date = last_sunday - timedelta(days=weeks * 7 - 1)
             end_date = last_sunday
 
         return start_date, end_date
 
-    def get_entry_type(self, clock_in_method, clock_out_method):
-        """
-        Replicate FnEntryType logic from Power Query.
-        """
-        ci = clock_in_method or "NULL"
-        co = clock_out_method or "NULL"
-
-        # Normalize
-        ci = ci.upper() if ci != "NULL" else ci
-        co = co.upper() if co != "NULL" else co
-
-        if ci == "FINGER" and co == "FINGER":
-            return "Finger"
-        if ci == "FINGER" and co == "REASSIGN":
-            return "Finger"
-        if ci == "REASSIGN" and co == "FINGER":
-            return "Finger"
-        if ci == "NULL" and co == "NULL":
-            return "Write-In"
-        if ci == "EMPID" or co == "EMPID":
-            return "Provisional Entry"
-        if ci == "NO SUCCESSFUL FINGERPRINT" or co == "NO SUCCESSFUL FINGERPRINT":
-            return "NO SUCCESSFUL FINGERPRINT"
-        if ci == "NULL":
-            return "Missing c/in"
-        if ci == "NULL" or co in ("MISSING C/O MNGR SUPPLIED", "NULL"):
-            return "Missing c/o"
-        if ci == "SWAP" or co == "SWAP":
-            return "Time-Swap"
-        if ci == "RAW CLOCK PAIR SPLIT" or co == "RAW CLOCK PAIR SPLIT":
-            return "Raw Clock Pair Split"
-        if ci == "WKEND RAW PAIR SPLT" or co == "WKEND RAW PAIR SPLT":
-            return "Programming or Wk End Rw Pair Split"
-        if ci == "REASSIGN" or co == "REASSIGN":
-            return "Manager FTW Reassignment"
-
-        return "Programming Issue"
-
-    def get_xlc_operation(self, ofc_name):
-        """Replicate office consolidation from Power Query."""
-        if ofc_name in ("Blue Ash", "Cincinnati", "St. Bernard"):
-            return "P&G Cincinnati"
-        return ofc_name
-
-    def fetch_production_data(self, conn, start_date, end_date):
+    def fetch_production_data(self, start_date, end_date, chunk_size=10000):
         """
         Execute the production stored procedure to get time entries.
         Uses the same procedure that Power Query calls.
+
+        Yields DataFrames of at most chunk_size rows so the full result set
+        is never held in memory at once. Reads typed Arrow batches when
+        arrow-odbc is installed, otherwise pyodbc rows.
         """
         self.stdout.write(f"Fetching data from {start_date} to {end_date}...")
 
@@ -159,144 +197,536 @@ class Command(BaseCommand):
             @dtReportEnd = ?
         """
 
-        cursor = conn.cursor()
-        cursor.execute(sql, (start_date, end_date))
+        if arrow_odbc is not None:
+            chunks = self._fetch_arrow_batches(sql, start_date, end_date, chunk_size)
+        else:
+            chunks = self._fetch_rows(sql, start_date, end_date, chunk_size)
+
+        fetched = 0
+        for df in chunks:
+            fetched += len(df)
+            yield df
+
+        self.stdout.write(f"Fetched {fetched} records from production")
+
+    def _fetch_arrow_batches(self, sql, start_date, end_date, chunk_size):
+        """Read the result set as Arrow record batches, straight from ODBC buffers."""
+        reader = arrow_odbc.read_arrow_batches_from_odbc(
+            query=sql,
+            connection_string=self.get_connection_string(),
+            batch_size=chunk_size,
+            # arrow-odbc binds parameters as VARCHAR; SQL Server converts ISO dates
+            parameters=[start_date.isoformat(), end_date.isoformat()],
+            packet_size=self.get_packet_size(),
+            login_timeout_sec=LOGIN_TIMEOUT_SECONDS,
+            # Bound buffers for any VARCHAR(MAX) columns
+            max_text_size=4096,
+            # Fetch the next batch on a driver thread while this one is processed
+            fetch_concurrently=True,
+        )
+        for batch in reader:
+            yield batch.to_pandas()
+
+    def _fetch_rows(self, sql, start_date, end_date, chunk_size):
+        """Read the result set as pyodbc rows, chunk_size rows at a time."""
+        # pyodbc's own context manager only commits on exit, so close explicitly
+        with closing(self.get_production_connection()) as conn:
+            cursor = conn.cursor()
+            cursor.execute(sql, (start_date, end_date))
 
-        # Get column names
-        columns = [column[0] for column in cursor.description]
+            # Get column names
+            columns = [column[0] for column in cursor.description]
 
-        # Fetch all rows
-        rows = cursor.fetchall()
-        self.stdout.write(f"Fetched {len(rows)} records from production")
+            for rows in self._prefetch_rows(cursor, chunk_size):
+                yield pd.DataFrame.from_records(rows, columns=columns)
 
-        # Convert to DataFrame
-        df = pd.DataFrame.from_records(rows, columns=columns)
+    @staticmethod
+    def _prefetch_rows(cursor, chunk_size, depth=2):
+        """
+        Yield fetchmany() chunks read ahead on a background thread.
 
-        return df
+        pyodbc releases the GIL while the ODBC driver fetches, so the next
+        chunk is read while the caller transforms and saves the current one.
+        At most depth chunks are buffered. Fetch errors are re-raised here.
+        """
+        chunks = queue.Queue(maxsize=depth)
+        stop = threading.Event()
+        done = object()
+
+        def put(item):
+            # Give up if the consumer has stopped reading
+            while not stop.is_set():
+                try:
+                    chunks.put(item, timeout=1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        def fetch():
+            try:
+                for rows in iter(lambda: cursor.fetchmany(chunk_size), []):
+                    if not put(rows):
+                        return
+                put(done)
+            except Exception as e:
+                put(e)
+
+        thread = threading.Thread(target=fetch, name='sync-prefetch', daemon=True)
+        thread.start()
+        try:
+            while (item := chunks.get()) is not done:
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            # Let the fetch thread finish before the connection is closed
+            stop.set()
+            thread.join()
+
+    @staticmethod
+    def _normalize_method(series):
+        """
+        Upper-case a categorical clock method column, treating '' as NULL.
+
+        Only the categories are rewritten (labels differing by case are
+        merged), so the cost is per distinct method rather than per row.
+        """
+        labels = series.cat.categories.str.upper()
+        labels = labels.where(labels != '', 'NULL')
+        categories = labels.unique()
+        codes = categories.get_indexer(labels)[series.cat.codes.to_numpy()]
+        return pd.Series(pd.Categorical.from_codes(codes, categories), index=series.index)
+
+    @staticmethod
+    def _classify_entry_types(ci, co):
+        """
+        Replicate FnEntryType logic from Power Query.
+
+        ci and co are upper-cased clock-in/out methods ('NULL' when missing).
+        Conditions are evaluated in order; the first match wins.
+        """
+        entry_type_rules = [
+            ((ci == 'FINGER') & co.isin(['FINGER', 'REASSIGN']), 'Finger'),
+            ((ci == 'REASSIGN') & (co == 'FINGER'), 'Finger'),
+            ((ci == 'NULL') & (co == 'NULL'), 'Write-In'),
+            ((ci == 'EMPID') | (co == 'EMPID'), 'Provisional Entry'),
+            ((ci == 'NO SUCCESSFUL FINGERPRINT') | (co == 'NO SUCCESSFUL FINGERPRINT'),
+             'NO SUCCESSFUL FINGERPRINT'),
+            (ci == 'NULL', 'Missing c/in'),
+            (co.isin(['MISSING C/O MNGR SUPPLIED', 'NULL']), 'Missing c/o'),
+            ((ci == 'SWAP') | (co == 'SWAP'), 'Time-Swap'),
+            ((ci == 'RAW CLOCK PAIR SPLIT') | (co == 'RAW CLOCK PAIR SPLIT'), 'Raw Clock Pair Split'),
+            ((ci == 'WKEND RAW PAIR SPLT') | (co == 'WKEND RAW PAIR SPLT'),
+             'Programming or Wk End Rw Pair Split'),
+            ((ci == 'REASSIGN') | (co == 'REASSIGN'), 'Manager FTW Reassignment'),
+        ]
+        return np.select(
+            [cond for cond, _ in entry_type_rules],
+            [value for _, value in entry_type_rules],
+            default='Programming Issue'
+        )
 
     def transform_data(self, df):
         """Apply Power Query transformations."""
-        self.stdout.write("Transforming data...")
-
         # Handle null values for clock methods
         df['ClockIn_Method'] = df['ClockIn_Method'].fillna('NULL')
         df['ClockOut_Method'] = df['ClockOut_Method'].fillna('NULL')
 
-        # Calculate EntryType
-        df['entry_type'] = df.apply(
-            lambda row: self.get_entry_type(row['ClockIn_Method'], row['ClockOut_Method']),
-            axis=1
+        # Store low-cardinality columns as categories so comparisons run on int codes
+        for col in CATEGORY_COLUMNS:
+            if col in df.columns:
+                df[col] = df[col].astype('category')
+
+        # Calculate EntryType: classify each (clock-in, clock-out) category pair
+        # once, then look every row up by its pair of integer codes
+        ci = self._normalize_method(df['ClockIn_Method'])
+        co = self._normalize_method(df['ClockOut_Method'])
+        ci_grid, co_grid = np.meshgrid(ci.cat.categories, co.cat.categories, indexing='ij')
+        lookup = self._classify_entry_types(pd.Series(ci_grid.ravel()), pd.Series(co_grid.ravel()))
+        entry_types = pd.Index(lookup).unique()
+        type_codes = entry_types.get_indexer(lookup).reshape(ci_grid.shape)
+        df['entry_type'] = pd.Categorical.from_codes(
+            type_codes[ci.cat.codes.to_numpy(), co.cat.codes.to_numpy()], entry_types
         )
 
+        # Filter to compliance-relevant entry types only, and out NOT_REQ_TO_CLOCK.
+        # The stored procedure has no parameters for these filters, so apply them
+        # before deriving the remaining columns to only transform rows that are kept.
+        # Both columns are categorical, so the combined mask compares integer codes.
+        valid_types = ['Finger', 'Missing c/o', 'Provisional Entry', 'Write-In']
+        keep = df['entry_type'].isin(valid_types)
+        if 'Allocation_Method' in df.columns:
+            keep &= df['Allocation_Method'] != 'NOT_REQ_TO_CLOCK'
+        df = df[keep].copy()
+
         # Calculate XLC Operation
-        df['xlc_operation'] = df['OfcName'].apply(self.get_xlc_operation)
+        df['xlc_operation'] = df['OfcName'].map(XLC_OPERATION_MAPPING).fillna(df['OfcName'])
 
         # Calculate FullName
-        df['full_name'] = df['LastName'].fillna('') + ', ' + df['FirstName'].fillna('')
+        df['full_name'] = df['LastName'].fillna('').str.cat(df['FirstName'].fillna(''), sep=', ')
+
+        # Store hours as float64 and clock tries as int32 instead of object columns
+        # (pyodbc returns SQL decimals as Decimal; float32 would lose precision for
+        # the DecimalField hours columns)
+        hour_columns = ['RegHours', 'OTHours', 'DTHours', 'HolWrkHours']
+        df[hour_columns] = df[hour_columns].apply(pd.to_numeric).fillna(0).astype('float64')
+        tries_columns = ['ClockIn_Tries', 'ClockOut_Tries']
+        df[tries_columns] = df[tries_columns].apply(pd.to_numeric).fillna(1).astype('int32')
 
         # Calculate Total Hours
-        df['total_hours'] = (
-            df['RegHours'].fillna(0) +
-            df['OTHours'].fillna(0) +
-            df['DTHours'].fillna(0) +
-            df['HolWrkHours'].fillna(0)
-        )
+        df['total_hours'] = df[hour_columns].sum(axis=1)
 
-        # Parse dates
-        df['dt_end_cli_work_week'] = pd.to_datetime(df['dtEndCliWorkWeek'])
-        df['work_date'] = pd.to_datetime(df['WorkDate'])
+        # Parse dates (no-op for datetime columns; strings take the ISO 8601 fast path)
+        df['dt_end_cli_work_week'] = pd.to_datetime(
+            df['dtEndCliWorkWeek'], format='ISO8601', cache=True, errors='coerce'
+        )
+        df['work_date'] = pd.to_datetime(df['WorkDate'], format='ISO8601', cache=True, errors='coerce')
+
+        # Week ending (and the year derived from it) is required, so drop rows
+        # whose week ending is missing or could not be parsed
+        unparsed = df['dt_end_cli_work_week'].isna()
+        if unparsed.any():
+            logger.warning(
+                "Dropping %d records with a missing or invalid dtEndCliWorkWeek", unparsed.sum()
+            )
+            df = df[~unparsed]
 
         # Add ISO week fields
-        df['week_number'] = df['dt_end_cli_work_week'].apply(
-            lambda d: d.isocalendar()[1] if pd.notna(d) else None
-        )
-        df['week_year'] = df['dt_end_cli_work_week'].apply(
-            lambda d: d.isocalendar()[0] if pd.notna(d) else None
-        )
+        iso = df['dt_end_cli_work_week'].dt.isocalendar()
+        df['week_number'] = iso['week']
+        df['week_year'] = iso['year']
         df['year'] = df['dt_end_cli_work_week'].dt.year
 
-        # Filter to compliance-relevant entry types only
-        valid_types = ['Finger', 'Missing c/o', 'Provisional Entry', 'Write-In']
-        df = df[df['entry_type'].isin(valid_types)]
+        # Remove duplicates (by natural key rather than hashing every column).
+        # Keep the first row, as drop_seen_duplicates does across chunks, so the
+        # row kept for a key does not depend on the chunk size.
+        df = df.drop_duplicates(subset=DUPLICATE_KEY_COLUMNS, keep='first')
 
-        # Filter out NOT_REQ_TO_CLOCK
-        if 'Allocation_Method' in df.columns:
-            df = df[df['Allocation_Method'] != 'NOT_REQ_TO_CLOCK']
+        return df
 
-        # Remove duplicates
-        df = df.drop_duplicates()
+    def drop_seen_duplicates(self, df, seen):
+        """
+        Drop rows whose natural key was already saved from an earlier chunk.
 
-        self.stdout.write(f"After transformations: {len(df)} records")
+        The first row seen for a key wins, matching transform_data.
 
-        return df
+        seen holds the key hashes kept so far; returns (df, updated seen).
+        The inferred dtype of a column can differ between chunks (int vs float
+        when a chunk has nulls, datetime64 units, date objects), and pandas
+        picks a per-column string format for datetimes (fractional seconds or
+        date-only depending on the other values). Keys are therefore hashed
+        as nanosecond integers for date/time columns and as strings otherwise.
+        """
+        normalized = df[DUPLICATE_KEY_COLUMNS].apply(self._key_column)
+        hashes = pd.util.hash_pandas_object(normalized, index=False).to_numpy()
+        is_new = ~np.isin(hashes, seen)
+        return df[is_new], np.concatenate([seen, hashes[is_new]])
+
+    @classmethod
+    def _key_column(cls, col):
+        """Normalize a natural-key column to a representation independent of the chunk."""
+        if is_datetime64_any_dtype(col) or infer_dtype(col, skipna=True) in ('date', 'datetime'):
+            # NaT becomes the minimum int64, which is itself a stable sentinel
+            return pd.Series(
+                pd.to_datetime(col).astype('datetime64[ns]').to_numpy().view('int64'),
+                index=col.index,
+            )
+        return cls._id_strings(col).astype('string')
+
+    @staticmethod
+    def _column_array(series, default=None):
+        """Return a column as an object array with missing values replaced by default."""
+        return series.astype(object).where(series.notna(), default).to_numpy()
+
+    @staticmethod
+    def _id_strings(series):
+        """
+        Return an ID column as strings, with missing values as ''.
+
+        A chunk with nulls types an integer ID column as float, so whole-number
+        floats are cast to Int64 first to store '1' rather than '1.0'.
+        """
+        if is_float_dtype(series) and (series.dropna() % 1 == 0).all():
+            series = series.astype('Int64')
+        return series.astype(object).where(series.notna(), '').astype(str)
+
+    def get_field_arrays(self, df):
+        """Map TimeEntry field names to column arrays extracted from the DataFrame."""
+        col = self._column_array
+        return {
+            'year': col(df['year']),
+            'week_number': col(df['week_number']),
+            'week_year': col(df['week_year']),
+            'dt_end_cli_work_week': col(df['dt_end_cli_work_week']),
+            'applicant_id': col(self._id_strings(df['ApplicantID'])),
+            'last_name': col(df['LastName'], ''),
+            'first_name': col(df['FirstName'], ''),
+            'full_name': col(df['full_name'], ''),
+            'employee_type_id': col(self._id_strings(df['EmployeeTypeID'])),
+            'xlc_operation': col(df['xlc_operation'], ''),
+            'bu_dept_name': col(df['BUDeptName'], ''),
+            'shift_number': col(self._id_strings(df['ShiftNumber'])),
+            'work_date': col(df['work_date']),
+            'dt_time_start': col(df['dtTimeStart']),
+            'dt_time_end': col(df['dtTimeEnd']),
+            'entry_type': col(df['entry_type'], ''),
+            'reg_hours': col(df['RegHours'], 0),
+            'ot_hours': col(df['OTHours'], 0),
+            'dt_hours': col(df['DTHours'], 0),
+            'hol_wrk_hours': col(df['HolWrkHours'], 0),
+            'total_hours': col(df['total_hours'], 0),
+            'clock_in_tries': col(df['ClockIn_Tries'].replace(0, 1), 1),
+            'clock_out_tries': col(df['ClockOut_Tries'].replace(0, 1), 1),
+        }
+
+    def build_insert_sql(self, fields, update_existing=False):
+        """
+        Build a single-row INSERT that resolves conflicts on unique_time_entry.
+
+        Existing rows are skipped, or updated in place when update_existing
+        is set. SQL Server uses MERGE; SQLite/PostgreSQL use ON CONFLICT.
+        """
+        quote = connection.ops.quote_name
+        table = quote(TimeEntry._meta.db_table)
+        constraint = next(c for c in TimeEntry._meta.constraints if c.name == 'unique_time_entry')
+        key_fields = [TimeEntry._meta.get_field(name) for name in constraint.fields]
+        key_columns = [quote(field.column) for field in key_fields]
+        columns = [quote(field.column) for field in fields]
+        update_columns = [col for col in columns if col not in key_columns]
+        column_list = ', '.join(columns)
+        placeholders = ', '.join(['%s'] * len(columns))
+
+        if connection.vendor == 'microsoft':
+            # SQL Server unique constraints treat NULLs as equal, so match them too
+            match = ' AND '.join(
+                f"(target.{col} = source.{col} OR (target.{col} IS NULL AND source.{col} IS NULL))"
+                if field.null else f"target.{col} = source.{col}"
+                for field, col in zip(key_fields, key_columns)
+            )
+            sql = (
+                f"MERGE INTO {table} WITH (HOLDLOCK) AS target "
+                f"USING (VALUES ({placeholders})) AS source ({column_list}) "
+                f"ON {match} "
+            )
+            if update_existing:
+                sql += "WHEN MATCHED THEN UPDATE SET " + ', '.join(
+                    f"{col} = source.{col}" for col in update_columns
+                ) + " "
+            return sql + (
+                f"WHEN NOT MATCHED THEN INSERT ({column_list}) "
+                f"VALUES ({', '.join(f'source.{col}' for col in columns)});"
+            )
+
+        sql = (
+            f"INSERT INTO {table} ({column_list}) VALUES ({placeholders}) "
+            f"ON CONFLICT ({', '.join(key_columns)}) "
+        )
+        if update_existing:
+            return sql + "DO UPDATE SET " + ', '.join(
+                f"{col} = excluded.{col}" for col in update_columns
+            )
+        return sql + "DO NOTHING"
+
+    def bulk_insert(self, columns, update_existing=False, batch_size=1000):
+        """
+        Insert column arrays into the TimeEntry table with executemany.
+
+        Bypasses ORM object construction (mssql-django supports neither
+        ignore_conflicts nor update_conflicts). On SQL Server, pyodbc's
+        fast_executemany binds each batch as a parameter array instead of
+        executing the statement once per row.
 
-    def save_to_database(self, df, replace=False, dry_run=False):
-        """Save transformed data to Django database."""
-        if dry_run:
-            self.stdout.write(self.style.WARNING("DRY RUN - No data saved"))
-            self.stdout.write(f"Would save {len(df)} records")
-            # Show sample
-            self.stdout.write("\nSample records:")
-            for _, row in df.head(5).iterrows():
-                self.stdout.write(
-                    f"  {row['xlc_operation']} | {row['dt_end_cli_work_week'].date()} | "
-                    f"{row['full_name']} | {row['entry_type']}"
-                )
-            return 0
-
-        # Get date range for replacement
-        min_date = df['dt_end_cli_work_week'].min()
-        max_date = df['dt_end_cli_work_week'].max()
+        Returns the number of rows the database inserted or updated, or None
+        when the backend does not report it (cursor.rowcount of -1).
+        """
+        fields = [field for field in TimeEntry._meta.concrete_fields if not field.primary_key]
+        sql = self.build_insert_sql(fields, update_existing)
+
+        # Column arrays already hold plain Python values, so only date/datetime
+        # fields need Django's per-backend conversion (formatting, aware datetimes);
+        # fields without a source column get the model default, as bulk_create would
+        row_count = len(next(iter(columns.values()), []))
+        prepared = []
+        for field in fields:
+            if field.name not in columns:
+                prepared.append(repeat(field.get_db_prep_save(field.get_default(), connection), row_count))
+            elif field.get_internal_type() in ADAPTED_FIELD_TYPES:
+                prepared.append([field.get_db_prep_save(v, connection) for v in columns[field.name]])
+            else:
+                prepared.append(columns[field.name])
+        rows = zip(*prepared)
+
+        with connection.cursor() as cursor:
+            if connection.vendor == 'microsoft':
+                # Django wrapper -> mssql-django wrapper -> pyodbc cursor
+                cursor.cursor.cursor.fast_executemany = True
+            changed = 0
+            for batch in iter(lambda: list(islice(rows, batch_size)), []):
+                cursor.executemany(sql, batch)
+                # Rows skipped on conflict are not counted
+                if changed is not None:
+                    changed = changed + cursor.rowcount if cursor.rowcount >= 0 else None
+
+        return changed
+
+    def show_sample(self, df):
+        """Print a few transformed records (used by --dry-run)."""
+        self.stdout.write("\nSample records:")
+        for _, row in df.head(5).iterrows():
+            self.stdout.write(
+                f"  {row['xlc_operation']} | {row['dt_end_cli_work_week'].date()} | "
+                f"{row['full_name']} | {row['entry_type']}"
+            )
+
+    def save_to_database(self, df, replace=False):
+        """
+        Save a transformed chunk to Django database.
 
+        Records already present (per the unique_time_entry constraint) are
+        updated in place with replace, and left untouched otherwise.
+
+        Returns the number of records inserted or updated, or None when the
+        database does not report it.
+        """
         with transaction.atomic():
-            if replace:
-                # Delete existing records in this date range
-                deleted, _ = TimeEntry.objects.filter(
-                    dt_end_cli_work_week__gte=min_date,
-                    dt_end_cli_work_week__lte=max_date
-                ).delete()
-                self.stdout.write(f"Deleted {deleted} existing records")
-
-            # Prepare records for bulk insert
-            records = []
-            for _, row in df.iterrows():
-                records.append(TimeEntry(
-                    year=row.get('year'),
-                    week_number=row.get('week_number'),
-                    week_year=row.get('week_year'),
-                    dt_end_cli_work_week=row.get('dt_end_cli_work_week'),
-                    applicant_id=str(row.get('ApplicantID', '')),
-                    last_name=row.get('LastName'),
-                    first_name=row.get('FirstName'),
-                    full_name=row.get('full_name'),
-                    employee_type=row.get('EmployeeTypeID'),
-                    xlc_operation=row.get('xlc_operation'),
-                    bu_dept_name=row.get('BUDeptName'),
-                    shift_number=str(row.get('ShiftNumber', '')),
-                    work_date=row.get('work_date'),
-                    dt_time_start=row.get('dtTimeStart'),
-                    dt_time_end=row.get('dtTimeEnd'),
-                    entry_type=row.get('entry_type'),
-                    regular_hours=row.get('RegHours', 0) or 0,
-                    overtime_hours=row.get('OTHours', 0) or 0,
-                    double_time_hours=row.get('DTHours', 0) or 0,
-                    holiday_hours=row.get('HolWrkHours', 0) or 0,
-                    total_hours=row.get('total_hours', 0) or 0,
-                    clock_in_tries=row.get('ClockIn_Tries', 1) or 1,
-                    clock_out_tries=row.get('ClockOut_Tries', 1) or 1,
-                ))
+            # Bulk insert from pre-extracted column arrays
+            saved = self.bulk_insert(self.get_field_arrays(df), update_existing=replace)
+            self.report_saved(len(df), saved)
 
-            # Bulk insert
-            TimeEntry.objects.bulk_create(records, batch_size=1000)
-            self.stdout.write(self.style.SUCCESS(f"Saved {len(records)} records"))
+            return saved
 
-            return len(records)
+    def report_saved(self, processed, saved):
+        """Write how many of the processed records were actually saved."""
+        if saved is None:
+            self.stdout.write(f"Processed {processed} records")
+        else:
+            self.stdout.write(f"Saved {saved} of {processed} records")
+
+    def delete_replaced_weeks(self, df, cleared=None):
+        """
+        Delete existing records in a production chunk's week-ending range (--replace).
+
+        Uses the raw chunk so weeks whose rows are all filtered out are still
+        cleared. cleared is the (min, max) range already replaced by earlier
+        chunks; only the part of the range outside it is deleted, so rows
+        saved by earlier chunks are kept. Returns the updated cleared range.
+        """
+        weeks = pd.to_datetime(df['dtEndCliWorkWeek'], format='ISO8601', errors='coerce').dropna()
+        if weeks.empty:
+            return cleared
+
+        min_date, max_date = weeks.min().date(), weeks.max().date()
+        if cleared is None:
+            stale = Q(dt_end_cli_work_week__gte=min_date, dt_end_cli_work_week__lte=max_date)
+        else:
+            stale = (
+                Q(dt_end_cli_work_week__gte=min_date, dt_end_cli_work_week__lt=cleared[0]) |
+                Q(dt_end_cli_work_week__gt=cleared[1], dt_end_cli_work_week__lte=max_date)
+            )
+            min_date = min(min_date, cleared[0])
+            max_date = max(max_date, cleared[1])
+
+        deleted, _ = TimeEntry.objects.filter(stale).delete()
+        if deleted:
+            self.stdout.write(f"Deleted {deleted} existing records")
+        return min_date, max_date
+
+    def sync_serial(self, chunks, replace=False, dry_run=False):
+        """
+        Transform and save chunks in this process, in a single transaction.
+
+        With replace, each chunk's weeks are cleared before it is saved, so
+        records edited or removed in production do not linger.
+
+        Returns (records fetched, records processed or that would be saved,
+        records saved or None if the database does not report it).
+        """
+        fetched = 0
+        count = 0
+        saved = 0
+        seen = np.empty(0, dtype=np.uint64)
+        cleared = None
+        with transaction.atomic():
+            for df in chunks:
+                fetched += len(df)
+                if replace and not dry_run:
+                    cleared = self.delete_replaced_weeks(df, cleared)
+                df = self.transform_data(df)
+                df, seen = self.drop_seen_duplicates(df, seen)
+                if df.empty:
+                    continue
+
+                if dry_run:
+                    if count == 0:
+                        self.show_sample(df)
+                    count += len(df)
+                    continue
+
+                count += len(df)
+                saved = add_saved(saved, self.save_to_database(df, replace=replace))
+
+        return fetched, count, saved
+
+    def sync_parallel(self, chunks, replace=False, workers=2):
+        """
+        Transform and save chunks in a pool of worker processes.
+
+        Production rows are still fetched here; each worker saves through
+        its own database connection, so every chunk commits on its own and
+        duplicates across chunks are resolved by the unique_time_entry
+        conflict handling. At most two chunks per worker are in flight to
+        keep memory bounded. Workers write interleaved key ranges of the
+        same weeks, so a chunk chosen as a deadlock victim is retried.
+
+        With replace, each chunk's weeks are cleared here before the chunk is
+        submitted. A newly cleared range lies outside every earlier chunk's
+        range, so it never holds rows written by this run.
+
+        Returns (records fetched, records processed, records saved or None).
+        """
+        fetched = 0
+        count = 0
+        saved = 0
+        cleared = None
+        # Spawn rather than fork: the fetch runs on a background thread inside the
+        # ODBC driver, and a forked child could inherit a lock held by it
+        connections.close_all()
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=django.setup,
+        ) as pool:
+            pending = set()
+            for df in chunks:
+                fetched += len(df)
+                if len(pending) >= workers * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    count, saved = self._collect(done, count, saved)
+                if replace:
+                    cleared = retry_on_deadlock(self.delete_replaced_weeks, df, cleared)
+                pending.add(pool.submit(sync_chunk, df, replace))
+            count, saved = self._collect(wait(pending).done, count, saved)
+
+        return fetched, count, saved
+
+    def _collect(self, futures, count, saved):
+        """Report finished chunk futures and add their counts to (count, saved)."""
+        for future in futures:
+            chunk_count, chunk_saved = future.result()
+            if chunk_count:
+                self.report_saved(chunk_count, chunk_saved)
+            count += chunk_count
+            saved = add_saved(saved, chunk_saved)
+        return count, saved
 
     def handle(self, *args, **options):
         year = options.get('year')
         weeks = options.get('weeks')
         dry_run = options.get('dry_run')
         replace = options.get('replace')
+        chunk_size = options.get('chunk_size')
+        workers = options.get('workers')
 
         self.stdout.write("=" * 60)
         self.stdout.write("BSTT Production Data Sync")
@@ -307,28 +737,73 @@ class Command(BaseCommand):
             start_date, end_date = self.calculate_date_range(year, weeks)
             self.stdout.write(f"Date range: {start_date} to {end_date}")
 
-            # Connect to production
-            conn = self.get_production_connection()
-
-            # Fetch data
-            df = self.fetch_production_data(conn, start_date, end_date)
+            # Fetch, transform and save one chunk at a time
+            chunks = self.fetch_production_data(start_date, end_date, chunk_size)
+            if workers > 1 and not dry_run:
+                fetched, count, saved = self.sync_parallel(chunks, replace, workers)
+            else:
+                fetched, count, saved = self.sync_serial(chunks, replace, dry_run)
 
-            if df.empty:
+            if fetched == 0:
                 self.stdout.write(self.style.WARNING("No data found for the specified period"))
                 return
 
-            # Transform
-            df = self.transform_data(df)
-
-            # Save
-            count = self.save_to_database(df, replace=replace, dry_run=dry_run)
+            if dry_run:
+                self.stdout.write(self.style.WARNING("DRY RUN - No data saved"))
+                self.stdout.write(f"Would save {count} records")
+                count = saved = 0
 
             self.stdout.write("=" * 60)
-            self.stdout.write(self.style.SUCCESS(f"Sync complete! {count} records processed"))
+            if saved is None:
+                self.stdout.write(self.style.SUCCESS(f"Sync complete! {count} records processed"))
+            else:
+                self.stdout.write(self.style.SUCCESS(
+                    f"Sync complete! {saved} of {count} records saved"
+                ))
 
         except Exception as e:
             self.stdout.write(self.style.ERROR(f"Sync failed: {e}"))
             raise
-        finally:
-            if 'conn' in locals():
-                conn.close()
+
+
+def sync_chunk(df, replace=False):
+    """
+    Transform and save one chunk of production rows (worker process entry point).
+
+    Output is discarded; the parent command reports the returned
+    (records processed, records saved or None).
+    """
+    command = Command(stdout=io.StringIO())
+    df = command.transform_data(df)
+    if df.empty:
+        return 0, 0
+    return len(df), retry_on_deadlock(command.save_to_database, df, replace=replace)
+
+
+def is_deadlock(error):
+    """Whether a database error is SQL Server choosing this transaction as deadlock victim."""
+    return '1205' in str(error) or '40001' in str(error)
+
+
+def retry_on_deadlock(func, *args, **kwargs):
+    """
+    Call func, retrying it when it is chosen as a deadlock victim.
+
+    func must run in its own transaction, which SQL Server has rolled back
+    by the time the deadlock error is raised.
+    """
+    for attempt in range(1, DEADLOCK_ATTEMPTS + 1):
+        try:
+            return func(*args, **kwargs)
+        except DatabaseError as e:
+            if attempt == DEADLOCK_ATTEMPTS or not is_deadlock(e):
+                raise
+            logger.warning("Deadlock victim, retrying (attempt %d of %d)", attempt + 1, DEADLOCK_ATTEMPTS)
+            time.sleep(attempt)
+
+
+def add_saved(total, saved):
+    """Add a saved-record count to a total; None (not reported) is sticky."""
+    if total is None or saved is None:
+        return None
+    return total + saved
@@ -0,0 +1,61 @@
+# Generated by Django 5.2.18 on 2026-10-15 18:12
+
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+UNIQUE_TIME_ENTRY_FIELDS = ['applicant_id', 'xlc_operation', 'dt_end_cli_work_week', 'dt_time_start']
+
+
+def remove_duplicate_time_entries(apps, schema_editor):
+    """
+    Delete TimeEntry rows that would violate unique_time_entry.
+
+    The constraint was declared on the model but never migrated, so
+    uploads could store the same entry more than once. The newest row
+    (highest id) is kept for each key; NULL dt_time_start values are
+    treated as equal, as SQL Server does.
+    """
+    TimeEntry = apps.get_model('core', 'TimeEntry')
+
+    duplicates = (
+        TimeEntry.objects
+        .values(*UNIQUE_TIME_ENTRY_FIELDS)
+        .annotate(keep_id=Max('id'), entries=Count('id'))
+        .filter(entries__gt=1)
+        .order_by()
+    )
+
+    removed = 0
+    for group in duplicates.iterator():
+        keep_id = group.pop('keep_id')
+        group.pop('entries')
+        deleted, _ = TimeEntry.objects.filter(**group).exclude(id=keep_id).delete()
+        removed += deleted
+
+    print(f"\nRemoved {removed} duplicate time entries")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_populate_week_numbers'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dataupload',
+            name='records_in_file',
+            field=models.IntegerField(default=0, help_text='Total records in uploaded file'),
+        ),
+        migrations.AddField(
+            model_name='dataupload',
+            name='records_skipped',
+            field=models.IntegerField(default=0, help_text='Duplicate records skipped'),
+        ),
+        migrations.RunPython(remove_duplicate_time_entries, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='timeentry',
+            constraint=models.UniqueConstraint(fields=('applicant_id', 'xlc_operation', 'dt_end_cli_work_week', 'dt_time_start'), name='unique_time_entry'),
+        ),
+    ]
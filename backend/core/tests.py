@@ -1,3 +1,254 @@
-from django.test import TestCase
+import io
+from datetime import date, datetime
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+import pandas as pd
+from django.db import OperationalError, connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+from django.utils import timezone
+
+from core.management.commands.sync_production import Command, sync_chunk
+from core.models import TimeEntry
+
+
+def production_row(applicant_id, start, office='Martinsburg', reg_hours=8.0, **overrides):
+    """One row as returned by the production stored procedure."""
+    row = {
+        'ApplicantID': applicant_id,
+        'LastName': 'Doe',
+        'FirstName': 'Jane',
+        'EmployeeTypeID': 'T',
+        'OfcName': office,
+        'BUDeptName': 'Dept',
+        'ShiftNumber': 1,
+        'WorkDate': datetime(2025, 1, 6),
+        'dtEndCliWorkWeek': datetime(2025, 1, 12),
+        'dtTimeStart': start,
+        'dtTimeEnd': start.replace(hour=16),
+        'RegHours': reg_hours,
+        'OTHours': 0.0,
+        'DTHours': 0.0,
+        'HolWrkHours': 0.0,
+        'ClockIn_Tries': 1,
+        'ClockOut_Tries': 1,
+        'ClockIn_Method': 'FINGER',
+        'ClockOut_Method': 'FINGER',
+        'Allocation_Method': 'X',
+    }
+    row.update(overrides)
+    return row
+
+
+def production_chunks(rows, chunk_size):
+    """Build DataFrames the way the pyodbc reader does, chunk_size rows at a time."""
+    columns = list(rows[0])
+    return [
+        pd.DataFrame.from_records([tuple(row.values()) for row in rows[i:i + chunk_size]], columns=columns)
+        for i in range(0, len(rows), chunk_size)
+    ]
+
+
+class SyncProductionTests(TestCase):
+    def sync(self, rows, chunk_size=10000, replace=False):
+        command = Command(stdout=io.StringIO())
+        return command.sync_serial(iter(production_chunks(rows, chunk_size)), replace=replace)
+
+    def test_chunk_size_does_not_change_saved_rows(self):
+        rows = [
+            production_row(101, datetime(2025, 1, 6, 8)),
+            # Fractional seconds change how pandas formats the whole column
+            production_row(102, datetime(2025, 1, 6, 9, 0, 0, 500000)),
+            # Same natural key as the first row, but a different office
+            production_row(101, datetime(2025, 1, 6, 8), office='Blue Ash'),
+        ]
+
+        self.sync(rows, chunk_size=3)
+        single_chunk = sorted(TimeEntry.objects.values_list('applicant_id', 'xlc_operation'))
+        TimeEntry.objects.all().delete()
+        self.sync(rows, chunk_size=2)
+        two_chunks = sorted(TimeEntry.objects.values_list('applicant_id', 'xlc_operation'))
+
+        self.assertEqual(len(single_chunk), 2)
+        self.assertEqual(single_chunk, two_chunks)
+
+    def test_replace_replaces_edited_row(self):
+        self.sync([
+            production_row(101, datetime(2025, 1, 6, 8)),
+            production_row(102, datetime(2025, 1, 6, 8)),
+        ])
+
+        # The clock-in was corrected in production, which changes the entry's key
+        self.sync([
+            production_row(101, datetime(2025, 1, 6, 8, 5), reg_hours=7.5),
+            production_row(102, datetime(2025, 1, 6, 8)),
+        ], chunk_size=1, replace=True)
+
+        entries = TimeEntry.objects.filter(applicant_id='101')
+        self.assertEqual(TimeEntry.objects.count(), 2)
+        self.assertEqual(entries.get().dt_time_start, timezone.make_aware(datetime(2025, 1, 6, 8, 5)))
+        self.assertEqual(entries.get().reg_hours, Decimal('7.50'))
+
+    def test_replace_removes_rows_no_longer_in_production(self):
+        self.sync([
+            production_row(101, datetime(2025, 1, 6, 8)),
+            production_row(102, datetime(2025, 1, 6, 8)),
+        ])
+
+        # Reclassified to an entry type that is not synced
+        self.sync([
+            production_row(101, datetime(2025, 1, 6, 8)),
+            production_row(102, datetime(2025, 1, 6, 8), Allocation_Method='NOT_REQ_TO_CLOCK'),
+        ], replace=True)
+
+        self.assertEqual(list(TimeEntry.objects.values_list('applicant_id', flat=True)), ['101'])
+
+    def test_default_skips_existing_rows(self):
+        self.sync([production_row(101, datetime(2025, 1, 6, 8))])
+
+        fetched, count, saved = self.sync([production_row(101, datetime(2025, 1, 6, 8), reg_hours=5.0)])
+
+        self.assertEqual((count, saved), (1, 0))
+        self.assertEqual(TimeEntry.objects.get().reg_hours, Decimal('8.00'))
+
+    def test_upsert_updates_existing_rows(self):
+        command = Command(stdout=io.StringIO())
+        first, second = (
+            command.transform_data(chunk)
+            for chunk in production_chunks([
+                production_row(101, datetime(2025, 1, 6, 8)),
+                production_row(101, datetime(2025, 1, 6, 8), reg_hours=5.0),
+            ], chunk_size=1)
+        )
+
+        command.save_to_database(first, replace=True)
+        saved = command.save_to_database(second, replace=True)
+
+        self.assertEqual(saved, 1)
+        self.assertEqual(TimeEntry.objects.get().reg_hours, Decimal('5.00'))
+
+    def test_sql_server_upsert_is_a_merge_on_unique_time_entry(self):
+        command = Command(stdout=io.StringIO())
+        fields = [field for field in TimeEntry._meta.concrete_fields if not field.primary_key]
+
+        with mock.patch.object(connection, 'vendor', 'microsoft'):
+            skip_sql = command.build_insert_sql(fields)
+            update_sql = command.build_insert_sql(fields, update_existing=True)
+
+        for sql in (skip_sql, update_sql):
+            self.assertTrue(sql.startswith('MERGE INTO "core_timeentry" WITH (HOLDLOCK)'))
+            self.assertIn('target."applicant_id" = source."applicant_id"', sql)
+            # dt_time_start is nullable, so NULLs must match each other
+            self.assertIn('target."dt_time_start" IS NULL AND source."dt_time_start" IS NULL', sql)
+            self.assertTrue(sql.endswith(';'))
+        self.assertNotIn('WHEN MATCHED', skip_sql)
+        self.assertIn('WHEN MATCHED THEN UPDATE SET "year" = source."year"', update_sql)
+        self.assertNotIn('"applicant_id" = source."applicant_id",', update_sql)
+
+    @mock.patch('core.management.commands.sync_production.time.sleep')
+    def test_worker_retries_deadlocked_chunk(self, sleep):
+        save = Command.save_to_database
+        attempts = []
+
+        def deadlock_once(command, df, replace=False):
+            attempts.append(df)
+            if len(attempts) == 1:
+                raise OperationalError('Transaction was chosen as the deadlock victim. (1205)')
+            return save(command, df, replace=replace)
+
+        with mock.patch.object(Command, 'save_to_database', autospec=True, side_effect=deadlock_once):
+            result = sync_chunk(production_chunks([production_row(101, datetime(2025, 1, 6, 8))], 1)[0])
+
+        self.assertEqual(result, (1, 1))
+        self.assertEqual(len(attempts), 2)
+        self.assertEqual(TimeEntry.objects.count(), 1)
+
+    def test_worker_does_not_retry_other_errors(self):
+        with mock.patch.object(Command, 'save_to_database', side_effect=OperationalError('disk I/O error')):
+            with self.assertRaises(OperationalError):
+                sync_chunk(production_chunks([production_row(101, datetime(2025, 1, 6, 8))], 1)[0])
+
+
+class FakeCursor:
+    """pyodbc cursor returning rows from a list, optionally failing after them."""
+
+    description = [('ApplicantID',), ('RegHours',)]
+
+    def __init__(self, rows, error=None):
+        self.rows = list(rows)
+        self.error = error
+
+    def execute(self, sql, params):
+        self.params = params
+
+    def fetchmany(self, size):
+        batch, self.rows = self.rows[:size], self.rows[size:]
+        if not batch and self.error:
+            raise self.error
+        return batch
+
+
+class FetchProductionRowsTests(SimpleTestCase):
+    def fetch(self, cursor, chunk_size):
+        conn = mock.Mock()
+        conn.cursor.return_value = cursor
+        # The generator runs after this returns, so keep the patches until the test ends
+        self.enterContext(mock.patch('core.management.commands.sync_production.arrow_odbc', None))
+        self.enterContext(mock.patch.object(Command, 'get_production_connection', return_value=conn))
+        command = Command(stdout=io.StringIO())
+        return command.fetch_production_data(date(2025, 1, 6), date(2025, 1, 12), chunk_size), conn
+
+    def test_rows_are_yielded_in_order_and_connection_is_closed(self):
+        chunks, conn = self.fetch(FakeCursor([(101, 8.0), (102, 7.5), (103, 6.0)]), chunk_size=2)
+
+        frames = list(chunks)
+
+        self.assertEqual([len(df) for df in frames], [2, 1])
+        self.assertEqual(pd.concat(frames)['ApplicantID'].tolist(), [101, 102, 103])
+        conn.close.assert_called_once()
+
+    def test_fetch_errors_are_raised_to_the_caller(self):
+        chunks, conn = self.fetch(FakeCursor([(101, 8.0)], error=RuntimeError('connection lost')), chunk_size=1)
+
+        with self.assertRaisesMessage(RuntimeError, 'connection lost'):
+            list(chunks)
+        conn.close.assert_called_once()
+
+    def test_stopping_early_closes_the_connection(self):
+        chunks, conn = self.fetch(FakeCursor([(i, 8.0) for i in range(10)]), chunk_size=1)
+
+        next(chunks)
+        chunks.close()
+
+        conn.close.assert_called_once()
+
+
+class RemoveDuplicateTimeEntriesMigrationTests(TransactionTestCase):
+    migrate_from = [('core', '0004_populate_week_numbers')]
+    migrate_to = [('core', '0005_add_unique_time_entry_constraint')]
+
+    def setUp(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.migrate_from)
+        OldTimeEntry = executor.loader.project_state(self.migrate_from).apps.get_model('core', 'TimeEntry')
+
+        entry = {
+            'year': 2025, 'xlc_operation': 'Martinsburg', 'dt_end_cli_work_week': date(2025, 1, 12),
+            'applicant_id': '101', 'entry_type': 'Finger',
+        }
+        for start, hours in [
+            (datetime(2025, 1, 6, 8), 1), (datetime(2025, 1, 6, 8), 2),
+            (None, 3), (None, 4),
+            (datetime(2025, 1, 7, 8), 5),
+        ]:
+            OldTimeEntry.objects.create(dt_time_start=start, reg_hours=hours, **entry)
+
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.migrate_to)
+
+    def test_keeps_newest_row_per_key(self):
+        self.assertEqual(
+            sorted(TimeEntry.objects.values_list('reg_hours', flat=True)),
+            [Decimal('2.00'), Decimal('4.00'), Decimal('5.00')],
+        )